@@ -33,15 +33,32 @@ Never commit tokens. In PowerShell:  $env:HF_TOKEN="hf_xxx"
 """
 
 
-import os, io, json, re, zipfile
-from io import BytesIO
-from datetime import datetime
+import os, sys, json, re, asyncio, hashlib, html, string, threading
+from concurrent.futures import Future
+from functools import lru_cache
 import streamlit as st
-from huggingface_hub import InferenceClient
-from dotenv import load_dotenv
+from huggingface_hub import InferenceClient, AsyncInferenceClient
+
+# Export deps load once per process here instead of on every rerun of the
+# exporters; keep startup graceful if a minimal env lacks them.
+try:
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+    from docx import Document
+    from docx.shared import Pt
+except ImportError:
+    FPDF = XPos = YPos = Document = Pt = None
+# zipfile/BytesIO are still imported inside the export helpers:
+# they are only needed once a resume exists, so page loads skip their cost.
+
+# Load environment variables once per process (API Key that you've created)
+@st.cache_resource
+def _load_env():
+    from dotenv import load_dotenv
+    load_dotenv()
+    return True
 
-# Load environment variables (API Key that you've created)
-load_dotenv()
+_load_env()
 
 # ====================== SETUP & CONFIG ======================
 
@@ -55,60 +72,131 @@ HF_MODEL = "meta-llama/Llama-3.1-8B-Instruct"  # allow override via env
 
 # Initialize HF Inference client only if a token is present
 # (Prevents crashes on startup; we still check again before calling the API.)
-client = InferenceClient(HF_MODEL, token=HF_TOKEN) 
+# cache_resource keeps one sync client per process instead of rebuilding the
+# underlying HTTP session on every Streamlit rerun.
+@st.cache_resource
+def get_client():
+    return InferenceClient(HF_MODEL, token=HF_TOKEN)
+
+client = get_client()
+
+# Async clients must NOT be shared across event loops: huggingface_hub pins
+# its lazily created httpx pool to the first loop that uses it, so a cached
+# instance raises "Event loop is closed" on the next asyncio.run scope.
+# Construction is cheap (the http session is created lazily), so each loop
+# builds its own.
+def make_async_client():
+    return AsyncInferenceClient(HF_MODEL, token=HF_TOKEN)
+
+# Fire a 1-token dummy request in the background so the model is warm by the time
+# the user clicks Generate (HF endpoints can cold-start on the first request).
+@st.cache_resource
+def warmup_model():
+    if not HF_TOKEN:
+        return False
+    def _ping():
+        try:
+            client.chat_completion(messages=[{"role": "user", "content": "hi"}], max_tokens=1)
+        except Exception:
+            pass  # warm-up is best-effort; real calls surface their own errors
+    threading.Thread(target=_ping, daemon=True).start()
+    return True
+
+warmup_model()
+
+# ====================== REQUEST BATCHER ======================
+# With several concurrent users each rerun used to dispatch its own HF call.
+# One background loop drains a shared queue in ~100 ms windows and issues the
+# window's requests together, collapsing identical payloads into a single call.
+# (Streaming generation stays on the session thread — it writes to the UI.)
+
+_BATCH_WINDOW_S = 0.1
+_BATCH_MAX_ITEMS = 8
+
+@st.cache_resource
+def get_batcher():
+    loop = asyncio.new_event_loop()
+    queue = asyncio.Queue()
+    aclient = make_async_client()  # dedicated to this loop for its lifetime
+
+    async def batcher():
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + _BATCH_WINDOW_S
+            while len(batch) < _BATCH_MAX_ITEMS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # One HF call per unique payload; duplicates share the result
+            unique = {}
+            for payload, fut in batch:
+                unique.setdefault(payload, []).append(fut)
+
+            async def run_one(payload, futs):
+                try:
+                    result = await aclient.chat_completion(**json.loads(payload))
+                except Exception as e:
+                    for f in futs:
+                        if not f.done(): f.set_exception(e)
+                else:
+                    for f in futs:
+                        if not f.done(): f.set_result(result)
 
-# ====================== SIDEBAR ======================
-#Sidebar handles resume style options, quick visual previews, and portfolio theme choice.
+            await asyncio.gather(*(run_one(p, fs) for p, fs in unique.items()))
 
-with st.sidebar:
-    # ----- Template selection -----
-    st.header("🎨 Template")
-    template = st.selectbox("Style", ["Modern", "Classic", "Professional"], index=0)
+    def runner():
+        asyncio.set_event_loop(loop)
+        loop.create_task(batcher())
+        loop.run_forever()
 
-    # ----- Generation options -----
-    st.header("⚙️ Options")
-    ai_overview = st.checkbox("Let AI write Professional Overview", value=True)
+    threading.Thread(target=runner, daemon=True).start()
+    return loop, queue
 
-# Define preview placeholders so sidebar updates live even before form submission
-title_preview = (st.session_state.get("pro_title") or "Software Engineer")
-name_preview = (st.session_state.get("name") or "NAME SURNAME").upper()
-loc_preview = (st.session_state.get("location") or "City, Country")
+# Enqueue a chat_completion on the shared batcher; returns a Future with the result.
+def submit_chat(**kwargs) -> Future:
+    loop, queue = get_batcher()
+    payload = json.dumps(kwargs, sort_keys=True)
+    fut = Future()
+    loop.call_soon_threadsafe(queue.put_nowait, (payload, fut))
+    return fut
 
-# ----- TEMPLATE PREVIEWS (visual difference among Modern / Classic / Professional) -----
-with st.sidebar:
-    st.header("🪟 Template Preview (styled)")
+# ====================== PREVIEW TEMPLATES ======================
+# Built once at import; only $name/$loc/$title vary per rerun, so the sidebar just
+# substitutes three values instead of re-formatting ~1KB of CSS+HTML every rerun.
 
-    if template == "Modern":
-        st.markdown(f"""
+_PREVIEW_MODERN = string.Template("""
         <style>
           /* Make colors readable on dark sidebars */
-          .prev-modern {{ color:#E5E7EB; }}
-          .prev-modern a {{ color:#E5E7EB; }}
-          .prev-modern h1 {{ font-family: Inter, system-ui, sans-serif; font-weight:800; font-size:16px; color:#E5E7EB; margin:0; text-transform:uppercase; }}
-          .prev-modern .sub {{ color:#CBD5E1; font-size:12px; }}
-          .prev-modern .chip {{ display:inline-block; background:#F8FAFC; color:#111827; border:1px solid #E2E8F0; border-radius:9999px; padding:2px 8px; font-size:11px; font-weight:600; margin-top:6px; }}
-          .prev-modern hr {{ border:0; border-top:2px solid rgba(229,231,235,.45); margin:6px 0; }}
-          .prev-modern .card {{ background:#0B1220; border-radius:14px; box-shadow:0 6px 24px rgba(0,0,0,.35); padding:10px; color:#E5E7EB; border:1px solid rgba(229,231,235,.18); }}
+          .prev-modern { color:#E5E7EB; }
+          .prev-modern a { color:#E5E7EB; }
+          .prev-modern h1 { font-family: Inter, system-ui, sans-serif; font-weight:800; font-size:16px; color:#E5E7EB; margin:0; text-transform:uppercase; }
+          .prev-modern .sub { color:#CBD5E1; font-size:12px; }
+          .prev-modern .chip { display:inline-block; background:#F8FAFC; color:#111827; border:1px solid #E2E8F0; border-radius:9999px; padding:2px 8px; font-size:11px; font-weight:600; margin-top:6px; }
+          .prev-modern hr { border:0; border-top:2px solid rgba(229,231,235,.45); margin:6px 0; }
+          .prev-modern .card { background:#0B1220; border-radius:14px; box-shadow:0 6px 24px rgba(0,0,0,.35); padding:10px; color:#E5E7EB; border:1px solid rgba(229,231,235,.18); }
         </style>
         <div class="prev-modern" style="font-family:Inter,system-ui,sans-serif; line-height:1.35;">
           <div style="text-align:center;">
-            <h1>{name_preview}</h1>
-            <div class="sub">{loc_preview}</div>
+            <h1>$name</h1>
+            <div class="sub">$loc</div>
             <div class="sub">Email | Phone · LinkedIn | GitHub</div>
-            <div class="chip">{title_preview}</div>
+            <div class="chip">$title</div>
           </div>
           <div style="margin-top:10px; font-weight:700; font-size:12px; color:#E5E7EB; letter-spacing:.05em;">PROFESSIONAL OVERVIEW</div>
           <hr>
           <div class="card" style="font-size:12px;">Clean, modern layout with neutral accents and soft cards.</div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
 
-    elif template == "Classic":
-        st.markdown(f"""
+_PREVIEW_CLASSIC = string.Template("""
         <div style="font-family: 'Times New Roman', Times, serif; line-height:1.35; color:#E5E7EB;">
           <div style="text-align:center;">
-            <div style="font-weight:800; font-size:16px; color:#FFFFFF;">{name_preview} — {title_preview}</div>
-            <div style="color:#CBD5E1; font-size:12px;">{loc_preview}</div>
+            <div style="font-weight:800; font-size:16px; color:#FFFFFF;">$name — $title</div>
+            <div style="color:#CBD5E1; font-size:12px;">$loc</div>
             <div style="font-size:12px; color:#E5E7EB;">Email | Phone</div>
             <div style="font-size:12px; color:#E5E7EB;">LinkedIn | GitHub</div>
           </div>
@@ -116,32 +204,73 @@ with st.sidebar:
           <hr style="border: 1px solid rgba(229,231,235,.6); margin:6px 0;">
           <div style="font-size:12px; color:#E5E7EB;">Traditional serif with thin black dividers. Formal & print-friendly.</div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
 
-    else:  # Professional – professional, minimal, monochrome
-        st.markdown(f"""
+_PREVIEW_PROFESSIONAL = string.Template("""
         <style>
-          .prev-professional {{ color:#E5E7EB; }}
-          .prev-professional h1 {{ font-family: 'Playfair Display', serif; font-weight:700; font-size:16px; color:#FFFFFF; margin:0; letter-spacing:.2px; }}
-          .prev-professional .sub {{ color:#CBD5E1; font-size:12px; }}
-          .prev-professional hr {{ border:0; border-top:1px solid rgba(229,231,235,.45); margin:6px 0; }}
-          .prev-professional .blurb {{ font-size:12px; color:#E5E7EB; }}
+          .prev-professional { color:#E5E7EB; }
+          .prev-professional h1 { font-family: 'Playfair Display', serif; font-weight:700; font-size:16px; color:#FFFFFF; margin:0; letter-spacing:.2px; }
+          .prev-professional .sub { color:#CBD5E1; font-size:12px; }
+          .prev-professional hr { border:0; border-top:1px solid rgba(229,231,235,.45); margin:6px 0; }
+          .prev-professional .blurb { font-size:12px; color:#E5E7EB; }
         </style>
         <link href="https://fonts.googleapis.com/css2?family=Playfair+Display:wght@600;700&display=swap" rel="stylesheet">
         <div class="prev-professional" style="font-family: Inter, system-ui, -apple-system, Segoe UI, Roboto, sans-serif; line-height:1.5;">
           <div style="text-align:center;">
-            <h1>{name_preview}</h1>
-            <div class="sub">{loc_preview}</div>
+            <h1>$name</h1>
+            <div class="sub">$loc</div>
             <div class="sub">Email | Phone · LinkedIn | GitHub</div>
           </div>
           <div style="margin-top:10px; font-weight:700; font-size:11px; letter-spacing:.08em; text-transform:uppercase; color:#E5E7EB;">Professional Overview</div>
           <hr>
           <div class="blurb">Professional typography with spacious layout and subtle contrasts.</div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
+
+# ====================== SIDEBAR ======================
+#Sidebar handles resume style options, quick visual previews, and portfolio theme choice.
+
+# Define preview placeholders so sidebar updates live even before form submission
+# (single session-state alias instead of repeated proxy lookups)
+_ss = st.session_state
+title_preview = (_ss.get("pro_title") or "Software Engineer")
+name_preview = (_ss.get("name") or "NAME SURNAME").upper()
+loc_preview = (_ss.get("location") or "City, Country")
+
+# ----- TEMPLATE PREVIEWS (visual difference among Modern / Classic / Professional) -----
+# Fragment: re-renders on its own when inputs change without re-running the whole script.
+@st.fragment
+def render_template_preview(template: str, name_preview: str, loc_preview: str, title_preview: str):
+    st.header("🪟 Template Preview (styled)")
+
+    if template == "Modern":
+        st.markdown(_PREVIEW_MODERN.substitute(name=name_preview, loc=loc_preview, title=title_preview),
+                    unsafe_allow_html=True)
+    elif template == "Classic":
+        st.markdown(_PREVIEW_CLASSIC.substitute(name=name_preview, loc=loc_preview, title=title_preview),
+                    unsafe_allow_html=True)
+    else:  # Professional – professional, minimal, monochrome
+        st.markdown(_PREVIEW_PROFESSIONAL.substitute(name=name_preview, loc=loc_preview, title=title_preview),
+                    unsafe_allow_html=True)
+
+# One contiguous sidebar block: entering st.sidebar once avoids re-diffing the
+# container tree for every separate `with` on each rerun.
+with st.sidebar:
+    # ----- Template selection -----
+    st.header("🎨 Template")
+    # a template switch invalidates any PDF prepared for the old style
+    template = st.selectbox("Style", ["Modern", "Classic", "Professional"], index=0,
+                            on_change=lambda: _ss.pop("_pdf_bytes", None))
+
+    # ----- Generation options -----
+    st.header("⚙️ Options")
+    ai_overview = st.checkbox("Let AI write Professional Overview", value=True)
+
+    render_template_preview(template, name_preview, loc_preview, title_preview)
 
     st.header("🌐 Portfolio Theme")
-    portfolio_theme = st.selectbox("Website Theme", ["Modern", "Professional"], index=0)
+    portfolio_theme = st.selectbox("Website Theme", ["Modern", "Professional"], index=0,
+                                   on_change=lambda: _ss.pop("_zip_bytes", None))
 
 # ====================== FORM: Collect user inputs for resume generation ======================
 # Captures all information needed by the model and exporters.
@@ -278,106 +407,94 @@ with st.form("resume_form"):
 # These small utilities clean, normalize, and post-process text before export or model prompts.
 # They make sure all generated resumes follow consistent formatting and bullet rules.
 
-HEADINGS = {
+# frozenset of interned strings: membership tests hit pointer-equality fast paths
+HEADINGS = frozenset(sys.intern(h) for h in (
     "PROFESSIONAL OVERVIEW","EDUCATION","SKILLS","EXPERIENCE / INTERNSHIPS",
     "PROJECTS","PUBLICATIONS","CERTIFICATIONS / HANDS-ON","ACHIEVEMENTS","PARTICIPATIONS",
-    "POSITIONS OF RESPONSIBILITY / CO-CURRICULAR INVOLVEMENT","TARGET ROLE"
-}
+    "POSITIONS OF RESPONSIBILITY / CO-CURRICULAR INVOLVEMENT","TARGET ROLE",
+))
+
+# Subset of HEADINGS whose body lines must carry bullet markers.
+BULLET_SECTIONS = frozenset(sys.intern(h) for h in (
+    "SKILLS","PUBLICATIONS","CERTIFICATIONS / HANDS-ON","ACHIEVEMENTS","PARTICIPATIONS",
+))
 
 # Normalize a heading: trim spaces, remove colons, and uppercase.
+# Memoized: export loops normalize the same lines on every rerun.
+@lru_cache(maxsize=4096)
 def normalize_heading(line: str) -> str:
-    s = line.strip()
-    if s.endswith(":"): s = s[:-1]
-    return s.upper()
+    return line.strip().rstrip(":").upper()
+
+# Translation table for smart quotes/dashes; built once so sanitize runs at C speed.
+_SMART_TBL = str.maketrans({"•":"-","–":"-","—":"-","’":"'","‘":"'","“":'"',"”":'"',"\u00A0":" "})
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7F]")
 
 # Sanitize text: replace smart quotes/dashes, collapse spaces, remove non-ASCII chars.
 def sanitize_plain_text(text: str) -> str:
-    replacements = {"•":"-","–":"-","—":"-","’":"'","‘":"'","“":'"',"”":'"',"\u00A0":" "}
-    for bad, good in replacements.items():
-        text = text.replace(bad, good)
-    lines = [" ".join(ln.split()) for ln in text.splitlines()]
-    text = "\n".join(lines)
-    return "".join(ch if ord(ch) < 128 else " " for ch in text)
+    text = text.translate(_SMART_TBL)
+    text = "\n".join(" ".join(ln.split()) for ln in text.splitlines())
+    return _NON_ASCII_RE.sub(" ", text)
 
 # Detect if a line looks like a project/publication title (no colon or dash).
 def is_project_or_pub_title_line(line: str) -> bool:
-    return bool(line.strip()) and (":" not in line) and (not line.strip().startswith("-"))
+    s = line.strip()
+    return bool(s) and (":" not in line) and (not s.startswith("-"))
+
+# Matches a run of heading/blank lines at the very start of the text.
+_LEADING_HEAD_RE = re.compile(
+    r"^(?:\s*(?:" + "|".join(re.escape(h) for h in HEADINGS) + r")\s*:?[ \t]*(?:\n|$))+",
+    re.I,
+)
 
 # Remove unwanted heading/menu lines before main resume content.
 def strip_heading_menu(text: str) -> str:
-    lines = [l for l in text.splitlines()]
-    i = 0; saw_non_heading = False
-    for j, l in enumerate(lines):
-        t = l.strip()
-        if not t: continue
-        if normalize_heading(t) in HEADINGS:
-            i = j + 1; continue
-        else:
-            saw_non_heading = True; break
-    return "\n".join(lines[i:]).strip() if saw_non_heading else ""
+    m = _LEADING_HEAD_RE.match(text)
+    rest = text[m.end():] if m else text
+    return rest.strip()
 
 # Ensure first section starts with "PROFESSIONAL OVERVIEW" (adds it if missing).
 def ensure_first_section_heading(text: str, heading="PROFESSIONAL OVERVIEW") -> str:
-    lines = [l.rstrip() for l in text.splitlines()]
-    i = 0
-    while i < len(lines) and not lines[i].strip():
-        i += 1
-    if i == len(lines):
+    stripped = text.lstrip()
+    if not stripped:
         return f"{heading}\n"
-    first = lines[i].strip().rstrip(":").upper()
-    if first != heading:
-        lines.insert(i, heading)
-        if i + 1 < len(lines) and not lines[i + 1].strip():
-            del lines[i + 1]
-    else:
-        if i + 1 < len(lines) and not lines[i + 1].strip():
-            del lines[i + 1]
-    return "\n".join(lines)
-
-# Enforce bullet markers in list-style sections (skills, certs, achievements, etc.).    
+    first = stripped.split("\n", 1)[0].strip().rstrip(":").upper()
+    if first == heading:
+        return stripped
+    return f"{heading}\n{stripped}"
+
+# Precompiled single-pass patterns: one finds heading lines, one bulletizes plain
+# lines inside list-style sections (both run inside the C regex engine).
+_HEADING_LINE_RE = re.compile(
+    r"(?m)^[ \t]*(" + "|".join(re.escape(h) for h in HEADINGS) + r")[ \t]*:?[ \t]*$",
+    re.I,
+)
+_PLAIN_LINE_RE = re.compile(r"(?m)^(?![ \t]*-\s|[ \t]*$)[ \t]*(.+?)[ \t]*$")
+
+# Enforce bullet markers in list-style sections (skills, certs, achievements, etc.).
 def enforce_bullets_in_sections(text: str) -> str:
     """Force bullets in these sections even if the LLM outputs plain lines."""
-    BULLET_SECTIONS = {
-        "SKILLS",
-        "PUBLICATIONS",
-        "CERTIFICATIONS / HANDS-ON",
-        "ACHIEVEMENTS",
-        "PARTICIPATIONS",
-    }
-    lines = text.splitlines()
-    out, in_block = [], False
-    for raw in lines:
-        ln = raw.rstrip()
-        up = normalize_heading(ln)
-
-        if up in BULLET_SECTIONS:
-            in_block = True
-            out.append(up)
-            continue
-
-        if in_block and up in HEADINGS:
-            in_block = False
-            out.append(up)
-            continue
-
-        if in_block:
-            s = ln.strip()
-            if s and not s.startswith("- "):
-                ln = "- " + s
-        out.append(ln)
-
-    return "\n".join(out)
+    out, pos, in_block = [], 0, False
+    for m in _HEADING_LINE_RE.finditer(text):
+        seg = text[pos:m.start()]
+        out.append(_PLAIN_LINE_RE.sub(r"- \1", seg) if in_block else seg)
+        up = m.group(1).upper()
+        in_block = up in BULLET_SECTIONS
+        out.append(up)
+        pos = m.end()
+    seg = text[pos:]
+    out.append(_PLAIN_LINE_RE.sub(r"- \1", seg) if in_block else seg)
+    return "".join(out)
 
 # ====================== FORMATTERS ======================
 # Format small data dicts into compact resume-ready lines/blocks.
 
 # Join only non-empty strings with a separator (used for dates/contacts).
 def join_nonempty(vals, sep=" | "):
-    return sep.join([v for v in vals if v and v.strip()])
+    return sep.join(filter(None, (v and v.strip() for v in vals)))
 
 # Format one education entry → "Institute — Degree | CGPA X | Start – End".
 def fmt_edu(e):
-    if not any(e.values()): return ""
+    if not any(v and v.strip() for v in e.values()): return ""
     bits = []
     if e["inst"] and e["degree"]: bits.append(f"{e['inst']} — {e['degree']}")
     elif e["inst"]: bits.append(e["inst"])
@@ -389,7 +506,7 @@ def fmt_edu(e):
 
 # Format one experience entry → "Company — Role | Period" + bullet for deliverables.
 def fmt_exp(e):
-    if not any(e.values()): return ""
+    if not any(v and v.strip() for v in e.values()): return ""
     when = join_nonempty([e["start"], e["end"]], " – ")
     header = join_nonempty([e["company"], e["role"]], " — ")
     line1 = f"{header} | {when}" if when else header
@@ -399,7 +516,7 @@ def fmt_exp(e):
 
 # Format one project → title + bullets for Problem/Approach/Tech/Impact/Link.
 def fmt_proj(p):
-    if not any(p.values()): return ""
+    if not any(v and v.strip() for v in p.values()): return ""
     lines = []
     if p["title"]:   lines.append(p["title"])
     if p["problem"]: lines.append(f"- Problem: {p['problem']}")
@@ -411,7 +528,7 @@ def fmt_proj(p):
 
 # Format one publication → title + bullets for Authors/Venue-Year/Summary/Link.
 def fmt_pub(p):
-    if not any(p.values()): return ""
+    if not any(v and v.strip() for v in p.values()): return ""
     parts = []
     if p["title"]: parts.append(p["title"])
     if p["authors"]: parts.append(f"- Authors: {p['authors']}")
@@ -424,7 +541,7 @@ def fmt_pub(p):
 
 # Format one position of responsibility → header + bullet for details.
 def fmt_por(p):
-    if not any(p.values()): return ""
+    if not any(v and v.strip() for v in p.values()): return ""
     head = join_nonempty([p["role"], p["org"], p["when"]], " | ")
     lines = [head]
     if p["det"]: lines.append(f"- {p['det']}")
@@ -468,51 +585,36 @@ def build_profile_text():
 
     overview_block = "" if ai_overview else summary.strip()
 
-    return f"""
-PROFESSIONAL OVERVIEW:
-{overview_block}
-
-EDUCATION:
-{edu_lines}
-
-SKILLS:
-{skills_txt}
-
-EXPERIENCE / INTERNSHIPS:
-{exp_lines}
-
-PROJECTS:
-{proj_lines}
-
-PUBLICATIONS:
-{pub_lines}
-
-CERTIFICATIONS / HANDS-ON:
-{cert_lines}
-
-ACHIEVEMENTS:
-{ach_lines}
-
-PARTICIPATIONS:
-{part_lines}
-
-POSITIONS OF RESPONSIBILITY / CO-CURRICULAR INVOLVEMENT:
-{por_lines}
-
-TARGET ROLE:
-{target_role}
-"""
-
-# Create the final LLM prompt (order, rules, and optional JD tailoring).
-def build_prompt(profile_text: str) -> str:
-    jd_block = f"\nJob Description to tailor to:\n{job_desc}\n" if job_desc.strip() else ""
-    ai_overview_rule = (
-        "\n- WRITE the 'PROFESSIONAL OVERVIEW' as a comprehensive 5–7 sentence CV-style summary using the profile below. "
-        "Make it tailored and impactful (projects, tools, outcomes)."
-        if ai_overview else
-        "\n- Use the given 'PROFESSIONAL OVERVIEW' content as-is."
-    )
-    return f"""
+    sections = [
+        ("PROFESSIONAL OVERVIEW", overview_block),
+        ("EDUCATION", edu_lines),
+        ("SKILLS", skills_txt),
+        ("EXPERIENCE / INTERNSHIPS", exp_lines),
+        ("PROJECTS", proj_lines),
+        ("PUBLICATIONS", pub_lines),
+        ("CERTIFICATIONS / HANDS-ON", cert_lines),
+        ("ACHIEVEMENTS", ach_lines),
+        ("PARTICIPATIONS", part_lines),
+        ("POSITIONS OF RESPONSIBILITY / CO-CURRICULAR INVOLVEMENT", por_lines),
+        ("TARGET ROLE", target_role.strip()),
+    ]
+    # Emit only filled sections: fewer prefill tokens = lower latency and cost per call
+    return "\n\n".join(f"{head}:\n{content}" for head, content in sections if content)
+
+# Estimate the output budget from profile density: decoding latency is linear in
+# max_tokens, so sparse profiles get a small cap (clamped to [400, 1600]).
+def estimate_max_tokens(profile: str) -> int:
+    return max(400, min(1600, 350 + 40 * profile.count("\n- ") + 80 * profile.count("\n\n")))
+
+# Bare-URL matcher for portfolio linkification (compiled once, not per call).
+_URL_RE = re.compile(r"https?://\S+")
+
+# Matches the score tail the prompt asks the model to append after the resume.
+_SCORE_TAIL_RE = re.compile(r"<<<SCORE>>>\s*(\{.*?\})\s*<<<END>>>", re.S)
+
+# Invariant instructions live in the system message so generation and scoring
+# calls share an identical prefix — lets the server's prefix cache skip prefill.
+SYSTEM_PROMPT = """Be concise and format professional resumes in plain text.
 Output CLEAN PLAIN TEXT (no markdown). Do not add any preface text.
 Begin directly with the heading 'PROFESSIONAL OVERVIEW' in uppercase.
 
@@ -532,7 +634,30 @@ Rules:
 - Do not invent info. Omit empty sections.
 - Use bullets only inside sections where the source text already has list-like lines.
 - In PROJECTS/PUBLICATIONS, keep structured sub-lines (Problem/Approach/Tech/Impact, Authors/Venue/Year/Summary/Link).
-- Include link lines if present (e.g., '- Link: ...').{ai_overview_rule}
+- Include link lines if present (e.g., '- Link: ...')."""
+
+# Create the final LLM prompt (order, rules, and optional JD tailoring).
+def build_prompt(profile_text: str) -> str:
+    jd_block = f"\nJob Description to tailor to:\n{job_desc}\n" if job_desc.strip() else ""
+    ai_overview_rule = (
+        "\n- WRITE the 'PROFESSIONAL OVERVIEW' as a comprehensive 5–7 sentence CV-style summary using the profile below. "
+        "Make it tailored and impactful (projects, tools, outcomes)."
+        if ai_overview else
+        "\n- Use the given 'PROFESSIONAL OVERVIEW' content as-is."
+    )
+    # Scoring rubric depends on what the user supplied (same modes as ats_score)
+    if job_desc.strip():
+        score_rule = "Score the resume against the Job Description above (ATS match)."
+    elif target_role.strip():
+        score_rule = f"Score how well the resume fits the target role '{target_role}'."
+    else:
+        score_rule = ("Score overall resume quality: structure, completeness, action verbs, "
+                      "measurable outcomes, readability for entry-level tech roles.")
+    return f"""
+Additional rules:{ai_overview_rule}
+- After the last resume section, append exactly one line and nothing after it:
+  <<<SCORE>>>{{"score": <integer 0-100>, "reasons": ["<brief reason>", "..."]}}<<<END>>>
+  {score_rule} Maximum 4 reasons.
 {jd_block}
 Here is the profile:
 {profile_text}
@@ -552,22 +677,75 @@ if submitted:
             try:
                 # 1) Build profile text from form inputs
                 profile = build_profile_text()
-                
+
                 # 2) Create deterministic prompt (order + rules)
                 prompt = build_prompt(profile)
-                
-                # 3) Call Hugging Face chat-instruct model
-                resp = client.chat_completion(
-                    messages=[
-                        {"role": "system", "content": "Be concise and format professional resumes in plain text."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=1600,
-                    temperature=0.6,
-                )
-                
+
+                # 3) Check the per-session cache first: identical inputs build an
+                # identical prompt, so a re-submit can skip the API entirely.
+                cache = st.session_state.setdefault("_resume_cache", {})
+                cache_key = hashlib.sha1(prompt.encode()).hexdigest()
+                cached = cache.get(cache_key)
+
+                if cached:
+                    raw_body, score_result = cached
+                else:
+                    # Call Hugging Face chat-instruct model (streamed so text appears as it generates)
+                    # Render token deltas live into a placeholder instead of waiting for the full completion
+                    ph = st.empty()
+
+                    async def gen_resume():
+                        aclient = make_async_client()  # lives and dies with this loop
+                        stream = await aclient.chat_completion(
+                            messages=[
+                                {"role": "system", "content": SYSTEM_PROMPT},
+                                {"role": "user", "content": prompt}
+                            ],
+                            max_tokens=estimate_max_tokens(profile),
+                            # Near-deterministic sampling: identical profiles produce
+                            # identical prompts/outputs, maximizing prefix-cache hits
+                            temperature=0.2,
+                            top_p=0.9,
+                            seed=42,
+                            stream=True,
+                        )
+                        buf = []
+                        async for chunk in stream:
+                            delta = chunk.choices[0].delta.get("content") or ""
+                            buf.append(delta)
+                            ph.markdown("".join(buf))
+                        return "".join(buf)
+
+                    raw = asyncio.run(gen_resume())
+                    ph.empty()
+
+                    # The prompt asks for a trailing score sentinel, so resume and
+                    # score arrive in one call — no second round trip or re-prefill.
+                    mode = "ATS" if job_desc.strip() else ("SYNTH" if target_role.strip() else "QUALITY")
+                    sm = _SCORE_TAIL_RE.search(raw)
+                    if sm:
+                        raw_body = raw[:sm.start()].rstrip()
+                        try:
+                            data = json.loads(sm.group(1))
+                            s = max(0, min(100, int(data.get("score", 0))))
+                            reasons = [str(x) for x in data.get("reasons", [])][:4]
+                            score_result = (s, reasons, mode)
+                        except Exception:
+                            score_result = (None, [], mode)
+                    else:
+                        raw_body = raw
+                        score_result = (None, [], mode)
+                    cache[cache_key] = (raw_body, score_result)
+
+                # A missing/unparsable sentinel must not pin a None score:
+                # leave _score unset so the sidebar falls back to ats_score.
+                if score_result[0] is not None:
+                    st.session_state["_score"] = score_result
+                else:
+                    st.session_state.pop("_score", None)
+
                 # 4) Normalize model output (strip menus, enforce first heading, bullets)
-                body = resp.choices[0].message["content"].strip()
+                body = raw_body.strip()
                 body = strip_heading_menu(body)
                 body = ensure_first_section_heading(body, "PROFESSIONAL OVERVIEW")
                 body = enforce_bullets_in_sections(body)  
@@ -580,6 +758,8 @@ if submitted:
                 # 6) Save to session for editor/scoring/exports
                 st.session_state["final_text"] = final_text
                 st.session_state["editor"] = final_text
+                for k in ("_pdf_bytes", "_docx_bytes", "_zip_bytes", "_final_text_hash"):
+                    st.session_state.pop(k, None)  # prepared downloads are stale now
                 st.success("Generated successfully. You can edit below and save before downloading.")
             
             except Exception as e:
@@ -589,23 +769,35 @@ if submitted:
 # ====================== SUGGESTIONS (sidebar) ======================
 # Lightweight heuristics to nudge users to complete key fields before export/portfolio.
 
-def build_suggestions():
+# Form fields the suggestions depend on; used to build the memoization key.
+_SUGGESTION_KEYS = ("linkedin","github","summary","skills_lang","skills_fw","skills_db","edu_inst_1","edu_deg_1")
+
+# Memoized on the field snapshot: reruns with unchanged inputs skip the rebuild.
+@st.cache_data(show_spinner=False)
+def _build_suggestions_cached(sig: tuple, ai_overview: bool) -> list:
     # Build a short list of actionable tips based on missing fields.
+    linkedin, github, summary, skills_lang, skills_fw, skills_db, edu_inst, edu_deg = sig
     tips = []
-    if not st.session_state.get("linkedin","").strip():
+    if not linkedin.strip():
         tips.append("Add your LinkedIn URL for credibility.")
-    if not st.session_state.get("github","").strip():
+    if not github.strip():
         tips.append("Add your GitHub URL if you have projects/code samples.")
-    if not st.session_state.get("summary","").strip() and not ai_overview:
+    if not summary.strip() and not ai_overview:
         tips.append("Write a 2–4 line Professional Overview or enable AI.")
-    if not st.session_state.get("skills_lang","").strip(): tips.append("List 3–6 programming languages.")
-    if not st.session_state.get("skills_fw","").strip():   tips.append("Add key frameworks/tools (Django/React/Git etc.)")
-    if not st.session_state.get("skills_db","").strip():   tips.append("Mention at least one database (MySQL/MongoDB).")
-    if not st.session_state.get("edu_inst_1","").strip() or not st.session_state.get("edu_deg_1","").strip():
+    if not skills_lang.strip(): tips.append("List 3–6 programming languages.")
+    if not skills_fw.strip():   tips.append("Add key frameworks/tools (Django/React/Git etc.)")
+    if not skills_db.strip():   tips.append("Mention at least one database (MySQL/MongoDB).")
+    if not edu_inst.strip() or not edu_deg.strip():
         tips.append("Complete Education #1 with institute and degree.")
     return tips[:8]
 
-with st.sidebar:
+def build_suggestions():
+    sig = tuple(st.session_state.get(k, "") for k in _SUGGESTION_KEYS)
+    return _build_suggestions_cached(sig, ai_overview)
+
+# Fragment: suggestions only re-render when their own state changes, not per keystroke.
+@st.fragment
+def render_suggestions():
     st.header("💡 Suggestions")
     # Render up to 8 suggestions; otherwise show all-good message.
     tips = build_suggestions()
@@ -621,7 +813,7 @@ with st.sidebar:
 #  - SYNTH  : no JD, but a target role given → synthesize JD
 #  - QUALITY: neither JD nor target role → generic resume quality
 
-def ats_score(resume_text: str, jd: str, target_role: str = "", skills_text: str = ""):
+async def ats_score_batch(resumes: list, jd: str, target_role: str = "", skills_text: str = ""):
     # Decide mode based on inputs
     mode = "ATS" if jd.strip() else ("SYNTH" if target_role.strip() else "QUALITY")
 
@@ -632,62 +824,83 @@ def ats_score(resume_text: str, jd: str, target_role: str = "", skills_text: str
             Key skills to look for: {skills_text}
             Focus on: impact statements, internships/projects relevant to {target_role}, core tools listed above.
             """
-    # Build strict-JSON prompts (short to save tokens)
+    # Build one strict-JSON prompt for all variants: the JD prefill is paid once, not N times
     if mode in {"ATS","SYNTH"}:
-        prompt = f"""
-                You are an ATS assistant. Score the candidate resume against the job description from 0 to 100.
-                Return STRICT JSON with keys: score (integer 0-100), reasons (array of brief strings, max 4).
-
-                Resume:
-
-                Job Description:
-
-                Only return JSON.
-                """
+        intro = (
+            "You are an ATS assistant. Score each candidate resume below against the job description "
+            f"from 0 to 100.\n\nJob Description:\n{jd}"
+        )
     else:
-        prompt = f"""
-                You are a resume quality checker. Score the resume from 0 to 100 on structure, completeness,
-                action verbs, measurable outcomes, readability, and section coverage for entry-level tech roles.
-                Return STRICT JSON with keys: score (integer 0-100), reasons (array of brief strings, max 4).
-
-                Resume:
-
-                Only return JSON.
-                """
-    # Call model; parse JSON; clamp score to [0, 100]
+        intro = (
+            "You are a resume quality checker. Score each resume below from 0 to 100 on structure, "
+            "completeness, action verbs, measurable outcomes, readability, and section coverage "
+            "for entry-level tech roles."
+        )
+    blocks = "\n".join(f"===RESUME {i}===\n{r}" for i, r in enumerate(resumes, 1))
+    prompt = (
+        f"{intro}\n\n{blocks}\n\n"
+        "Return a STRICT JSON array with one object per resume, in order, each with keys: "
+        "score (integer 0-100), reasons (array of brief strings, max 4). Only return JSON."
+    )
+    # Call model through the shared batcher (coalesces concurrent sessions);
+    # parse JSON array; clamp scores to [0, 100]
     try:
-        r = client.chat_completion(
+        # No system message here: the resume-format SYSTEM_PROMPT ("plain text,
+        # begin with PROFESSIONAL OVERVIEW") contradicts the JSON-only contract
+        # and makes the model break the parseable output more often than the
+        # prefix-cache hit saves.
+        r = await asyncio.wrap_future(submit_chat(
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=300, temperature=0.2,
-        )
+            max_tokens=300 * len(resumes), temperature=0.2, seed=42,
+        ))
         txt = r.choices[0].message["content"]
-        m = re.search(r"\{.*\}", txt, re.S)
-        data = json.loads(m.group(0)) if m else json.loads(txt)
-        score = int(data.get("score", 0)); score = max(0, min(100, score))
-        reasons = [str(x) for x in data.get("reasons", [])][:4]
-        return score, reasons, mode
+        m = re.search(r"\[.*\]", txt, re.S)
+        items = json.loads(m.group(0)) if m else json.loads(txt)
+        out = []
+        for data in items[:len(resumes)]:
+            score = int(data.get("score", 0)); score = max(0, min(100, score))
+            reasons = [str(x) for x in data.get("reasons", [])][:4]
+            out.append((score, reasons, mode))
+        out.extend([(None, [], mode)] * (len(resumes) - len(out)))  # pad short replies
+        return out
     except Exception:
-        return None, [], mode
+        return [(None, [], mode)] * len(resumes)
 
-# ----- Sidebar: show score if resume exists -----
+# Single-resume convenience wrapper over the batched scorer.
+async def ats_score(resume_text: str, jd: str, target_role: str = "", skills_text: str = ""):
+    results = await ats_score_batch([resume_text], jd, target_role=target_role, skills_text=skills_text)
+    return results[0]
+
+# ----- Sidebar: suggestions + score (second contiguous block; runs after generation
+# so the score reflects the resume produced on this rerun) -----
 with st.sidebar:
+    render_suggestions()
+
     st.header("📊 Score")
     # Only score after first generation to save API calls
-    if st.session_state.get("final_text"):
+    _ss = st.session_state
+    if _ss.get("final_text"):
         skills_text = " | ".join([
-            st.session_state.get("skills_lang",""),
-            st.session_state.get("skills_fw",""),
-            st.session_state.get("skills_db",""),
-            st.session_state.get("skills_cloud",""),
-            st.session_state.get("skills_soft",""),
+            _ss.get("skills_lang",""),
+            _ss.get("skills_fw",""),
+            _ss.get("skills_db",""),
+            _ss.get("skills_cloud",""),
+            _ss.get("skills_soft",""),
         ])
-        with st.spinner("Scoring…"):
-            s, reasons, mode = ats_score(
-                st.session_state["final_text"],
-                st.session_state.get("job_desc",""),
-                target_role=st.session_state.get("target_role",""),
-                skills_text=skills_text
-            )
+        # Reuse the score computed alongside generation; rescore only after
+        # edits. Failed scores are never cached, so reruns keep retrying.
+        if (cached_score := _ss.get("_score")) and cached_score[0] is not None:
+            s, reasons, mode = cached_score
+        else:
+            with st.spinner("Scoring…"):
+                s, reasons, mode = asyncio.run(ats_score(
+                    _ss["final_text"],
+                    _ss.get("job_desc",""),
+                    target_role=_ss.get("target_role",""),
+                    skills_text=skills_text
+                ))
+                if s is not None:
+                    _ss["_score"] = (s, reasons, mode)
         if s is None:
             st.caption("Couldn’t compute score. Try again after editing.")
         else:
@@ -701,16 +914,30 @@ with st.sidebar:
 # ====================== EXPORTS ======================
 # Build PDF/DOCX/TXT bytes in-memory for Streamlit download buttons.
 
+# Per-template PDF styling: (heading_size, body_size, line_gap, font_reg,
+# font_bold, divider_color, divider_width). Modern leaves fonts as None and
+# resolves Calibri/Arial after the add_font attempt.
+_TEMPLATE_STYLES = {
+    "Classic":      (12, 11, 6, "Times",     "Times",     (0, 0, 0),       0.2),
+    "Professional": (12, 11, 6, "Helvetica", "Helvetica", (160, 160, 160), 0.2),
+    "Modern":       (13, 11, 6, None,        None,        (180, 180, 180), 0.6),
+}
+
+# Memoized so the two-file disk stat runs once per process, not twice per export.
+@lru_cache(maxsize=1)
+def has_calibri():
+    return os.path.exists("calibri.ttf") and os.path.exists("calibrib.ttf")
+
 # Export resume to PDF (A4). Minimal styling; fonts depend on selected template.
-def export_pdf(text, name):
+# Cached on (text, name, template): reruns that don't change the resume reuse the
+# built bytes instead of re-synthesizing the document for the download button.
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_pdf(text, name, template):
     # 1) Clean text and split header vs body
     # 2) Choose fonts/sizes by template (Classic/Professional/Modern)
     # 3) Center header; draw thin dividers between sections
     # 4) Bold project/publication titles; write body with multi_cell
 
-    from fpdf import FPDF
-    import os
-
     safe = sanitize_plain_text(text)
     lines = safe.splitlines()
 
@@ -730,36 +957,23 @@ def export_pdf(text, name):
     pdf.set_text_color(0,0,0)
 
     # ---------- font + sizing per template ----------
-    def has_calibri():
-        return os.path.exists("calibri.ttf") and os.path.exists("calibrib.ttf")
-
-    if template == "Classic":
-        heading_size, body_size, line_gap = 12, 11, 6
-        font_reg, font_bold = ("Times", "Times")
-        divider_color, divider_width = (0, 0, 0), 0.2
-    elif template == "Professional":
-        heading_size, body_size, line_gap = 12, 11, 6
-        font_reg, font_bold = ("Helvetica", "Helvetica")
-        divider_color, divider_width = (160, 160, 160), 0.2
-    else:  # Modern -> Calibri (or Arial fallback)
-        heading_size, body_size, line_gap = 13, 11, 6
+    (heading_size, body_size, line_gap, font_reg, font_bold,
+     divider_color, divider_width) = _TEMPLATE_STYLES.get(template, _TEMPLATE_STYLES["Modern"])
+    if font_reg is None:  # Modern -> Calibri (or Helvetica fallback)
+        font_reg = font_bold = "Helvetica"
         if has_calibri():
             try:
-                pdf.add_font("Calibri", "", "calibri.ttf", uni=True)
-                pdf.add_font("Calibri", "B", "calibrib.ttf", uni=True)
-                font_reg, font_bold = ("Calibri", "Calibri")
+                pdf.add_font("Calibri", "", "calibri.ttf")
+                pdf.add_font("Calibri", "B", "calibrib.ttf")
+                font_reg = font_bold = "Calibri"
             except Exception:
-                font_reg, font_bold = ("Arial", "Arial")
-        else:
-            font_reg, font_bold = ("Arial", "Arial")
-        divider_color, divider_width = (180, 180, 180), 0.6
-
-    def is_heading(s): return normalize_heading(s) in HEADINGS
+                pass
 
     # Centered header (name/title/contacts)
     for i, h in enumerate(hdr):
         pdf.set_font(font_bold if i == 0 else font_reg, "B" if i == 0 else "", size=(heading_size+2 if i==0 else body_size))
-        pdf.multi_cell(0, line_gap + (1 if i==0 else 0), h, align="C")
+        pdf.multi_cell(0, line_gap + (1 if i==0 else 0), h, align="C",
+                       new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     pdf.ln(2)
 
     # Divider helper
@@ -772,7 +986,16 @@ def export_pdf(text, name):
         pdf.set_draw_color(0,0,0)
         pdf.set_line_width(0.2)
 
-    # Body writer (headings, bold titles, paragraphs)
+    # Body writer (headings, bold titles, paragraphs). Consecutive plain lines
+    # collect in a buffer and go out as one multi_cell call — fpdf2 handles the
+    # embedded newlines, so it lays out a run of lines in a single pass.
+    buffer: list[str] = []
+
+    def flush_buffer():
+        if buffer:
+            pdf.multi_cell(0, line_gap, "\n".join(buffer), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            buffer.clear()
+
     in_projects = False
     in_publications = False
     first_section_written = False
@@ -781,37 +1004,41 @@ def export_pdf(text, name):
         if not line:
             continue
 
-        if is_heading(line):
+        nh = normalize_heading(line)  # computed once per line, reused below
+        if nh in HEADINGS:
+            flush_buffer()
             if first_section_written:
                 draw_divider()
             first_section_written = True
-            in_projects = (normalize_heading(line) == "PROJECTS")
-            in_publications = (normalize_heading(line) == "PUBLICATIONS")
+            in_projects = (nh == "PROJECTS")
+            in_publications = (nh == "PUBLICATIONS")
             section_heading_size = heading_size + (1 if template == "Modern" else 0)
             pdf.set_font(font_bold, "B", section_heading_size)
-            pdf.cell(0, line_gap + 1, normalize_heading(line), ln=1)
+            pdf.cell(0, line_gap + 1, nh, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             pdf.set_font(font_reg, "", body_size)
             continue
 
         if (in_projects or in_publications) and is_project_or_pub_title_line(line):
+            flush_buffer()
             pdf.set_font(font_bold, "B", body_size)
-            pdf.multi_cell(0, line_gap, line)
+            pdf.multi_cell(0, line_gap, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             pdf.set_font(font_reg, "", body_size)
             continue
 
-        pdf.multi_cell(0, line_gap, line)
+        buffer.append(line)
+    flush_buffer()
 
-    return pdf.output(dest="S").encode("latin-1","ignore")
+    # fpdf2 returns a bytearray directly — no unicode round trip or lossy encode
+    return bytes(pdf.output())
 
 # Export resume to DOCX (Calibri 11). Simple bold headings + plain paragraphs.
+@st.cache_data(show_spinner=False, max_entries=8)
 def export_docx(text, name):
     # 1) Clean text
     # 2) Write 1–4 centered header lines (name/title/contacts)
     # 3) For each section: bold heading, blank gap, then content
     # 4) Bold project/publication titles
 
-    from docx import Document
-    from docx.shared import Pt
     safe = sanitize_plain_text(text)
     doc = Document()
     style = doc.styles["Normal"]; style.font.name = "Calibri"; style.font.size = Pt(11)
@@ -826,6 +1053,17 @@ def export_docx(text, name):
             add_center(lines[idx], bold=(k==0), size=(16 if k==0 else 11)); idx += 1
         else: break
     # body with blank divider between sections (no decorative chars)
+    # Consecutive plain lines share one paragraph (soft line breaks), so
+    # python-docx builds far fewer XML elements on body-heavy resumes.
+    buf: list[str] = []
+
+    def flush_buf():
+        if buf:
+            r = doc.add_paragraph(buf[0]).runs[0]
+            for l in buf[1:]:
+                r.add_break(); r.add_text(l)
+            buf.clear()
+
     in_projects = False
     in_publications = False
     first_section_written = False
@@ -834,58 +1072,131 @@ def export_docx(text, name):
         if not line:
             continue
         
-        if normalize_heading(line) in HEADINGS:
+        nh = normalize_heading(line)  # computed once per line, reused below
+        if nh in HEADINGS:
+            flush_buf()
             if first_section_written:
                 doc.add_paragraph("")  # clean gap divider
             first_section_written = True
-            in_projects = (normalize_heading(line)=="PROJECTS")
-            in_publications = (normalize_heading(line)=="PUBLICATIONS")
-            p = doc.add_paragraph(); r = p.add_run(normalize_heading(line)); r.bold=True; r.font.size=Pt(12)
+            in_projects = (nh=="PROJECTS")
+            in_publications = (nh=="PUBLICATIONS")
+            p = doc.add_paragraph(); r = p.add_run(nh); r.bold=True; r.font.size=Pt(12)
             continue
         
         if (in_projects or in_publications) and is_project_or_pub_title_line(line):
+            flush_buf()
             p = doc.add_paragraph(); r = p.add_run(line); r.bold = True; continue
-        doc.add_paragraph(line)
+        buf.append(line)
+    flush_buf()
+    from io import BytesIO
     out = BytesIO(); doc.save(out); return out.getvalue()
 
+# Section display order for the portfolio page; interned like HEADINGS so the
+# dict membership checks hit the pointer-equality fast path.
+_PORTFOLIO_SECTION_ORDER = tuple(sys.intern(h) for h in (
+    "PROFESSIONAL OVERVIEW", "EDUCATION", "SKILLS", "EXPERIENCE / INTERNSHIPS",
+    "PROJECTS", "PUBLICATIONS", "CERTIFICATIONS / HANDS-ON", "ACHIEVEMENTS",
+    "PARTICIPATIONS", "POSITIONS OF RESPONSIBILITY / CO-CURRICULAR INVOLVEMENT",
+))
+
+from datetime import datetime
+_CURRENT_YEAR = datetime.now().year  # footer year; one syscall per process, not per render
+
+# Portfolio stylesheet skeleton; only the theme-dependent values get substituted.
+_STYLES_TEMPLATE = string.Template("""
+:root {
+  --bg: #ffffff;
+  --card: #ffffff;
+  --text: $text;
+  --sub: $sub;
+  --accent: $accent;
+  --divider: $divider;
+}
+html, body { background: var(--bg); color: var(--text); font-family: Inter, Arial, sans-serif; }
+/* Keep theme color but make links obviously clickable */
+a { color: var(--accent); text-decoration: underline; font-weight: 600; }
+a:hover { text-decoration: underline; opacity: 0.9; }
+.sec-body a { text-decoration: underline; font-weight: 600; }
+.container { max-width: 900px; margin: 24px auto 80px; padding: 0 18px; }
+.hero { text-align: center; padding: 40px 16px 16px; border-bottom: 1px solid var(--divider); }
+.hero h1 { font-family: $h1_font; letter-spacing: .5px; font-size: 32px; font-weight: 800; color: var(--text); }
+.hero .title { margin-top: 6px; color: var(--sub); font-weight: 600; }
+.hero .loc { margin-top: 4px; color: var(--sub); }
+.hero .contacts { margin-top: 10px; color: var(--text); }
+.sec {
+  padding: 16px;
+  margin: 14px 0;
+  border-radius: $sec_radius;
+  background: $sec_bg;
+  border: $sec_border;
+  box-shadow: $sec_shadow;
+}
+.theme-professional .sec { border: none; border-bottom: 1px solid var(--divider); border-radius: 0; background: transparent; padding: 20px 0; }
+.theme-professional .sec:last-child { border-bottom: none; }
+.sec h2 { font-size: 18px; font-weight: 800; letter-spacing: .4px; margin-bottom: 8px; color: $h2_color; }
+.sec-body { line-height: 1.6; color: var(--text); }
+.sec-body .li { margin-left: 12px; }
+.foot { text-align:center; color: var(--sub); padding: 24px 0 40px; border-top: 1px solid var(--divider); margin-top: 32px; }
+""")
+
 # ====================== EDITOR + SAVE + DOWNLOADS ======================
 # After generation, let user tweak text, save to session, and download files.
 
-if st.session_state.get("final_text"):
+if final_text := st.session_state.get("final_text"):
     st.subheader("✏️ Edit before download")
     # Keep an editable copy; warn if there are unsaved changes.
     # Download buttons: PDF / DOCX / TXT
     
-    st.session_state.setdefault("editor", st.session_state["final_text"])
+    st.session_state.setdefault("editor", final_text)
     # Show editor and unsaved-change hint
     editor_val = st.text_area("Make quick fixes. Click **Save changes** to update.", key="editor", height=700)
 
-    if editor_val != st.session_state["final_text"]:
+    # Cheap dirty check: length first, then hashes (CPython caches str hashes,
+    # so only the edited editor text ever gets rehashed).
+    saved_text = st.session_state["final_text"]
+    saved_hash = st.session_state.setdefault("_final_text_hash", hash(saved_text))
+    if len(editor_val) != len(saved_text) or hash(editor_val) != saved_hash:
         st.info("You have unsaved edits. Click **Save changes** to apply them.")
 
     # Persist edits back to session
     if st.button("💾 Save changes"):
         st.session_state["final_text"] = st.session_state["editor"]
+        st.session_state["_final_text_hash"] = hash(st.session_state["editor"])
+        st.session_state.pop("_score", None)  # rescore against the edited text
+        # prepared downloads are stale once the text changes
+        for k in ("_pdf_bytes", "_docx_bytes", "_zip_bytes"):
+            st.session_state.pop(k, None)
         st.success("Changes saved. You can download now ✅")
 
+    # Re-read once after Save may have replaced the text; serves the download
+    # buttons and the portfolio builder below.
     final_text = st.session_state["final_text"]
     c1, c2, c3 = st.columns(3)
     # Build filenames safely from name; sanitize text for TXT.
-    # Use in-memory bytes for Streamlit's download buttons.
-    c1.download_button(
-        "⬇️ Download PDF",
-        data=export_pdf(final_text, name),
-        file_name=f"{(name or 'resume').replace(' ', '_')}.pdf",
-        mime="application/pdf",
-        use_container_width=True,
-    )
-    c2.download_button(
-        "⬇️ Download DOCX",
-        data=export_docx(final_text, name),
-        file_name=f"{(name or 'resume').replace(' ', '_')}.docx",
-        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        use_container_width=True,
-    )
+    # download_button evaluates data= eagerly on every rerun, so PDF/DOCX are
+    # only built after their Prepare click and then kept in session state.
+    if "_pdf_bytes" in st.session_state:
+        c1.download_button(
+            "⬇️ Download PDF",
+            data=st.session_state["_pdf_bytes"],
+            file_name=f"{(name or 'resume').replace(' ', '_')}.pdf",
+            mime="application/pdf",
+            use_container_width=True,
+        )
+    elif c1.button("🛠️ Prepare PDF", use_container_width=True):
+        st.session_state["_pdf_bytes"] = export_pdf(final_text, name, template)
+        st.rerun()
+    if "_docx_bytes" in st.session_state:
+        c2.download_button(
+            "⬇️ Download DOCX",
+            data=st.session_state["_docx_bytes"],
+            file_name=f"{(name or 'resume').replace(' ', '_')}.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            use_container_width=True,
+        )
+    elif c2.button("🛠️ Prepare DOCX", use_container_width=True):
+        st.session_state["_docx_bytes"] = export_docx(final_text, name)
+        st.rerun()
     c3.download_button(
         "⬇️ Download TXT",
         data=sanitize_plain_text(final_text).encode("utf-8"),
@@ -899,103 +1210,76 @@ if st.session_state.get("final_text"):
 
     # Split final resume text into {SECTION: body} blocks and preserve order.
     def extract_section_blocks(full_text: str):
-        blocks = {}
-        order = []
-        current = None
-        lines = full_text.splitlines()
-        # skip 1-4 header lines (name/location/contacts)
-        i = 0; header_lines = 0
-        while i < len(lines) and lines[i].strip() and normalize_heading(lines[i]) not in HEADINGS:
-            header_lines += 1; i += 1
-            if header_lines >= 4: break
-        body = "\n".join(lines[i:])
-        cur = None; buf = []
-        for ln in body.splitlines():
-            if normalize_heading(ln) in HEADINGS:
-                if cur:
-                    blocks[cur] = "\n".join(buf).strip()
-                    buf = []
-                cur = normalize_heading(ln); order.append(cur)
-            else:
-                buf.append(ln)
-        if cur:
-            blocks[cur] = "\n".join(buf).strip()
+        # skip 1-4 header lines (name/location/contacts) by advancing a char
+        # offset — no splitlines + join round trip over the whole text
+        offset = 0
+        for _ in range(4):
+            end = full_text.find("\n", offset)
+            line = full_text[offset:] if end == -1 else full_text[offset:end]
+            if not line.strip() or normalize_heading(line) in HEADINGS:
+                break
+            offset = len(full_text) if end == -1 else end + 1
+        # One C-level sweep: split on heading lines interleaves
+        # [preamble, heading1, body1, heading2, body2, ...]
+        parts = _HEADING_LINE_RE.split(full_text[offset:])
+        order = [normalize_heading(h) for h in parts[1::2]]
+        blocks = {h: b.strip() for h, b in zip(order, parts[2::2])}
         return blocks, order
 
     # Convert bare URLs to clickable <a> links.
     def linkify(text: str) -> str:
-        text = re.sub(r'\\1', '', text)  # remove escaped artifact if any
-        return re.sub(r'(https?://[^\s]+)', r'<a href="\1" target="_blank">\1</a>', text)
+        return _URL_RE.sub(r'<a href="\g<0>" target="_blank">\g<0></a>', text)
 
 
     # Render HTML + CSS for the portfolio (Modern/Professional theme).
+    @st.cache_data(show_spinner=False, max_entries=8)
     def build_portfolio_html(full_text: str, name: str, pro_title: str, location: str,
                              email: str, phone: str, linkedin: str, github: str,
                              theme: str = "Modern"):
         blocks, order = extract_section_blocks(full_text)
         is_professional = (theme == "Professional")
 
-        styles_css = f"""
-:root {{
-  --bg: #ffffff;
-  --card: #ffffff;
-  --text: {('#222222' if is_professional else '#111827')};
-  --sub: {('#555555' if is_professional else '#4b5563')};
-  --accent: {('#222222' if is_professional else '#111827')};
-  --divider: {('#e6e6e6' if is_professional else '#e5e7eb')};
-}}
-html, body {{ background: var(--bg); color: var(--text); font-family: Inter, Arial, sans-serif; }}
-/* Keep theme color but make links obviously clickable */
-a {{ color: var(--accent); text-decoration: underline; font-weight: 600; }}
-a:hover {{ text-decoration: underline; opacity: 0.9; }}
-.sec-body a {{ text-decoration: underline; font-weight: 600; }}
-.container {{ max-width: 900px; margin: 24px auto 80px; padding: 0 18px; }}
-.hero {{ text-align: center; padding: 40px 16px 16px; border-bottom: 1px solid var(--divider); }}
-.hero h1 {{ font-family: {("'Playfair Display', serif" if is_professional else "Inter, Arial, sans-serif")}; letter-spacing: .5px; font-size: 32px; font-weight: 800; color: var(--text); }}
-.hero .title {{ margin-top: 6px; color: var(--sub); font-weight: 600; }}
-.hero .loc {{ margin-top: 4px; color: var(--sub); }}
-.hero .contacts {{ margin-top: 10px; color: var(--text); }}
-.sec {{
-  padding: 16px;
-  margin: 14px 0;
-  border-radius: {('0px' if is_professional else '16px')};
-  background: {('transparent' if is_professional else 'var(--card)')};
-  border: {('1px solid var(--divider)' if is_professional else '1px solid #eef2ff')};
-  box-shadow: {('none' if is_professional else '0 6px 24px rgba(0,0,0,.08)')};
-}}
-.theme-professional .sec {{ border: none; border-bottom: 1px solid var(--divider); border-radius: 0; background: transparent; padding: 20px 0; }}
-.theme-professional .sec:last-child {{ border-bottom: none; }}
-.sec h2 {{ font-size: 18px; font-weight: 800; letter-spacing: .4px; margin-bottom: 8px; color: {('var(--text)' if is_professional else 'var(--accent)')}; }}
-.sec-body {{ line-height: 1.6; color: var(--text); }}
-.sec-body .li {{ margin-left: 12px; }}
-.foot {{ text-align:center; color: var(--sub); padding: 24px 0 40px; border-top: 1px solid var(--divider); margin-top: 32px; }}
-"""
+        styles_css = _STYLES_TEMPLATE.substitute(
+            text=("#222222" if is_professional else "#111827"),
+            sub=("#555555" if is_professional else "#4b5563"),
+            accent=("#222222" if is_professional else "#111827"),
+            divider=("#e6e6e6" if is_professional else "#e5e7eb"),
+            h1_font=("'Playfair Display', serif" if is_professional else "Inter, Arial, sans-serif"),
+            sec_radius=("0px" if is_professional else "16px"),
+            sec_bg=("transparent" if is_professional else "var(--card)"),
+            sec_border=("1px solid var(--divider)" if is_professional else "1px solid #eef2ff"),
+            sec_shadow=("none" if is_professional else "0 6px 24px rgba(0,0,0,.08)"),
+            h2_color=("var(--text)" if is_professional else "var(--accent)"),
+        )
 
-        def sec_html(title_key):
-            if title_key not in blocks or not blocks[title_key].strip():
-                return ""
-            lines = [ln.strip() for ln in blocks[title_key].splitlines() if ln.strip()]
-            html_lines = []
-            for ln in lines:
+        # One pass, appending fragments; a single join at the end beats nested f-strings.
+        out: list[str] = []
+        for key in _PORTFOLIO_SECTION_ORDER:
+            if key not in blocks or not blocks[key].strip():
+                continue
+            out.append(f'<section class="sec">\n  <h2>{key.title()}</h2>\n  <div class="sec-body">')
+            for ln in blocks[key].splitlines():
+                ln = ln.strip()
+                if not ln:
+                    continue
                 if ln.startswith("- "):
-                    html_lines.append(f"<div class='li'>• {linkify(ln[2:])}</div>")
+                    out.append(f"<div class='li'>• {linkify(html.escape(ln[2:]))}</div>")
                 else:
                     # For POSITIONS header + next-line details style, keep plain divs
-                    html_lines.append(f"<div>{linkify(ln)}</div>")
-            body_html = "\n".join(html_lines)
-            return f"""
-            <section class="sec">
-              <h2>{title_key.title()}</h2>
-              <div class="sec-body">{body_html}</div>
-            </section>
-            """
-
-        wanted = [
-            "PROFESSIONAL OVERVIEW","EDUCATION","SKILLS","EXPERIENCE / INTERNSHIPS",
-            "PROJECTS","PUBLICATIONS","CERTIFICATIONS / HANDS-ON","ACHIEVEMENTS","PARTICIPATIONS",
-            "POSITIONS OF RESPONSIBILITY / CO-CURRICULAR INVOLVEMENT"
+                    out.append(f"<div>{linkify(html.escape(ln))}</div>")
+            out.append("</div>\n</section>\n")
+        sections_html = "\n".join(out)
+
+        # Precompute the hero pieces so the page template below stays flat.
+        name_upper = (name or "").upper()
+        loc_html = f"<div class='loc'>{location}</div>" if location else ""
+        contact_bits = [
+            f"<b>Email:</b> {email}" if email else "",
+            f"<b>Phone:</b> {phone}" if phone else "",
+            f"<b>LinkedIn:</b> <a href='{linkedin}' target='_blank'>{linkedin}</a>" if linkedin else "",
+            f"<b>GitHub:</b> <a href='{github}' target='_blank'>{github}</a>" if github else "",
         ]
-        html_sections = [sec_html(k) for k in wanted if k in blocks and blocks[k].strip()]
+        contacts_html = " | ".join(s for s in contact_bits if s)
 
         index_html = f"""<!doctype html>
 <html lang="en">
@@ -1006,23 +1290,22 @@ a:hover {{ text-decoration: underline; opacity: 0.9; }}
   <style>*{{box-sizing:border-box;margin:0;padding:0}}</style>
   <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
   <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&family=Playfair+Display:wght@600;700&display=swap" rel="stylesheet">
-  <style>{styles_css}</style>
   <link rel="stylesheet" href="styles.css" />
 </head>
 <body class="theme-{'professional' if is_professional else 'modern'}">
   <header class="hero">
-    <h1>{(name or '').upper()}</h1>
+    <h1>{name_upper}</h1>
     <div class="title">{pro_title or ''}</div>
-    {f"<div class='loc'>{location}</div>" if location else ""}
-    <div class="contacts">{ " | ".join([s for s in [f"<b>Email:</b> {email}" if email else "", f"<b>Phone:</b> {phone}" if phone else "", f"<b>LinkedIn:</b> <a href='"+linkedin+"' target='_blank'>"+linkedin+"</a>" if linkedin else "", f"<b>GitHub:</b> <a href='"+github+"' target='_blank'>"+github+"</a>" if github else ""] if s]) }</div>
+    {loc_html}
+    <div class="contacts">{contacts_html}</div>
   </header>
 
   <main class="container">
-    {"".join(html_sections)}
+    {sections_html}
   </main>
 
   <footer class="foot">
-    © {datetime.now().year} {(name or '')}. Built with AI Resume & Portfolio Builder.
+    © {_CURRENT_YEAR} {(name or '')}. Built with AI Resume & Portfolio Builder.
   </footer>
 </body>
 </html>
@@ -1030,46 +1313,56 @@ a:hover {{ text-decoration: underline; opacity: 0.9; }}
         return index_html, styles_css
 
     # Package index.html + styles.css into a .zip (in-memory).
+    @st.cache_data(show_spinner=False, max_entries=8)
     def make_portfolio_zip(index_html: str, styles_css: str, filename: str = "portfolio_site.zip"):
+        import zipfile
+        from io import BytesIO
         bio = BytesIO()
-        with zipfile.ZipFile(bio, mode="w", compression=zipfile.ZIP_DEFLATED) as z:
+        # Level 1 Deflate: the site is small text, so fast compression wins.
+        with zipfile.ZipFile(bio, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as z:
             z.writestr("index.html", index_html)
             z.writestr("styles.css", styles_css)  # optional external file
-        bio.seek(0)
-        return bio.getvalue()
+        return bytes(bio.getbuffer())
 
     # Quick gate: only enable Portfolio download when minimal resume data is present.
     def form_is_complete() -> bool:
-        has_contact = all([name and name.strip(), email and email.strip(), phone and phone.strip(), location and location.strip()])
-        has_core = any([skills_lang.strip(), skills_fw.strip(), skills_db.strip(), skills_cloud.strip()])
-        has_edu = bool((st.session_state.get("edu_inst_1","").strip() and st.session_state.get("edu_deg_1","").strip()))
-        has_proj_or_exp = any([
-            st.session_state.get("proj_title_1","").strip(),
-            st.session_state.get("exp_comp_1","").strip() and st.session_state.get("exp_role_1","").strip(),
-        ])
-        return has_contact and has_core and has_edu and has_proj_or_exp
+        # Snapshot session keys once; generators below short-circuit on the
+        # first failing check instead of building throwaway lists.
+        ss = st.session_state
+        edu_inst = ss.get("edu_inst_1", "").strip()
+        edu_deg = ss.get("edu_deg_1", "").strip()
+        proj_title = ss.get("proj_title_1", "").strip()
+        exp_comp = ss.get("exp_comp_1", "").strip()
+        exp_role = ss.get("exp_role_1", "").strip()
+        has_contact = all(v and v.strip() for v in (name, email, phone, location))
+        has_core = any(v.strip() for v in (skills_lang, skills_fw, skills_db, skills_cloud))
+        return bool(has_contact and has_core and edu_inst and edu_deg
+                    and (proj_title or (exp_comp and exp_role)))
 
     # If form complete, generate portfolio site and expose as .zip download.
-    # Otherwise, show guidance on what fields to fill.
-    if st.session_state.get("final_text"):
-        final_text = st.session_state["final_text"]
-        if form_is_complete():
-            idx_html, css_txt = build_portfolio_html(
-                final_text,
-                name=name, pro_title=pro_title, location=location,
-                email=email, phone=phone, linkedin=linkedin, github=github,
-                theme=portfolio_theme
-            )
-            zip_bytes = make_portfolio_zip(idx_html, css_txt)
+    # Otherwise, show guidance on what fields to fill. final_text is already in
+    # scope from the single guard above.
+    if form_is_complete():
+        # Same two-stage pattern as PDF/DOCX: build the site only on demand.
+        if "_zip_bytes" in st.session_state:
             st.download_button(
                 "🌐 Download Portfolio (HTML .zip)",
-                data=zip_bytes,
+                data=st.session_state["_zip_bytes"],
                 file_name=f"{(name or 'portfolio').replace(' ', '_')}_site.zip",
                 mime="application/zip",
                 use_container_width=True,
             )
-        else:
-            st.info("Fill all required fields (contact, basic skills, education #1, and at least one project or experience) and generate your resume to enable the Portfolio download.")
+        elif st.button("🛠️ Prepare Portfolio (HTML .zip)", use_container_width=True):
+            idx_html, css_txt = build_portfolio_html(
+                final_text,
+                name=name, pro_title=pro_title, location=location,
+                email=email, phone=phone, linkedin=linkedin, github=github,
+                theme=portfolio_theme
+            )
+            st.session_state["_zip_bytes"] = make_portfolio_zip(idx_html, css_txt)
+            st.rerun()
+    else:
+        st.info("Fill all required fields (contact, basic skills, education #1, and at least one project or experience) and generate your resume to enable the Portfolio download.")
 
 # ====================== END OF FILE ======================
 # Notes for contributors:
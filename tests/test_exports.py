@@ -0,0 +1,43 @@
+# Smoke tests for the export helpers. Importing app runs the Streamlit script
+# in bare mode (widgets return defaults, no server), which is enough to call
+# the cached export functions directly.
+
+import app
+
+# Multi-line header (name + location + contacts) followed by sections with
+# consecutive bullets and a bold project title — the shapes that exercise
+# every multi_cell path in export_pdf.
+SAMPLE_RESUME = """JANE DOE
+City, Country
+Email: jane@example.com | Phone: 123-456
+LinkedIn: linkedin.com/in/jane | GitHub: github.com/jane
+
+PROFESSIONAL OVERVIEW
+Driven engineer with measurable impact.
+
+SKILLS
+- Python
+- SQL
+
+PROJECTS
+Cool App
+- Built the backend
+- Shipped to production
+"""
+
+
+def test_export_pdf_returns_pdf_bytes():
+    out = app.export_pdf(SAMPLE_RESUME, "Jane Doe", "Classic")
+    assert isinstance(out, bytes)
+    assert out.startswith(b"%PDF")
+
+
+def test_export_pdf_all_templates():
+    for template in ("Modern", "Classic", "Professional"):
+        assert app.export_pdf(SAMPLE_RESUME, "Jane Doe", template)
+
+
+def test_export_docx_returns_bytes():
+    out = app.export_docx(SAMPLE_RESUME, "Jane Doe")
+    assert isinstance(out, bytes)
+    assert out.startswith(b"PK")  # docx is a zip container